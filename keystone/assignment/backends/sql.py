@@ -13,6 +13,7 @@
 # under the License.
 
 from oslo_config import cfg
+import sqlalchemy
 
 from keystone import assignment as keystone_assignment
 from keystone.common import sql
@@ -195,34 +196,46 @@ class Assignment(keystone_assignment.AssignmentDriverV9):
 
         return actor_types or target_types
 
+    def _denormalize_role_assignment(self, ref):
+        assignment = {}
+        if ref.type == AssignmentType.USER_PROJECT:
+            assignment['user_id'] = ref.actor_id
+            assignment['project_id'] = ref.target_id
+        elif ref.type == AssignmentType.USER_DOMAIN:
+            assignment['user_id'] = ref.actor_id
+            assignment['domain_id'] = ref.target_id
+        elif ref.type == AssignmentType.GROUP_PROJECT:
+            assignment['group_id'] = ref.actor_id
+            assignment['project_id'] = ref.target_id
+        elif ref.type == AssignmentType.GROUP_DOMAIN:
+            assignment['group_id'] = ref.actor_id
+            assignment['domain_id'] = ref.target_id
+        else:
+            raise exception.Error(message=_(
+                'Unexpected assignment type encountered, %s') %
+                ref.type)
+        assignment['role_id'] = ref.role_id
+        if ref.inherited:
+            assignment['inherited_to_projects'] = 'projects'
+        return assignment
+
+    def _filter_by_role_and_actors(self, query, role_id, user_id, group_ids):
+        actors = None
+        if group_ids:
+            actors = group_ids
+        elif user_id:
+            actors = [user_id]
+
+        if role_id:
+            query = query.filter_by(role_id=role_id)
+        if actors:
+            query = query.filter(RoleAssignment.actor_id.in_(actors))
+        return query
+
     def list_role_assignments(self, role_id=None,
                               user_id=None, group_ids=None,
                               domain_id=None, project_ids=None,
                               inherited_to_projects=None):
-
-        def denormalize_role(ref):
-            assignment = {}
-            if ref.type == AssignmentType.USER_PROJECT:
-                assignment['user_id'] = ref.actor_id
-                assignment['project_id'] = ref.target_id
-            elif ref.type == AssignmentType.USER_DOMAIN:
-                assignment['user_id'] = ref.actor_id
-                assignment['domain_id'] = ref.target_id
-            elif ref.type == AssignmentType.GROUP_PROJECT:
-                assignment['group_id'] = ref.actor_id
-                assignment['project_id'] = ref.target_id
-            elif ref.type == AssignmentType.GROUP_DOMAIN:
-                assignment['group_id'] = ref.actor_id
-                assignment['domain_id'] = ref.target_id
-            else:
-                raise exception.Error(message=_(
-                    'Unexpected assignment type encountered, %s') %
-                    ref.type)
-            assignment['role_id'] = ref.role_id
-            if ref.inherited:
-                assignment['inherited_to_projects'] = 'projects'
-            return assignment
-
         with sql.transaction() as session:
             assignment_types = self._get_assignment_types(
                 user_id, group_ids, project_ids, domain_id)
@@ -233,18 +246,9 @@ class Assignment(keystone_assignment.AssignmentDriverV9):
             elif domain_id:
                 targets = [domain_id]
 
-            actors = None
-            if group_ids:
-                actors = group_ids
-            elif user_id:
-                actors = [user_id]
-
-            query = session.query(RoleAssignment)
+            query = self._filter_by_role_and_actors(
+                session.query(RoleAssignment), role_id, user_id, group_ids)
 
-            if role_id:
-                query = query.filter_by(role_id=role_id)
-            if actors:
-                query = query.filter(RoleAssignment.actor_id.in_(actors))
             if targets:
                 query = query.filter(RoleAssignment.target_id.in_(targets))
             if assignment_types:
@@ -252,7 +256,33 @@ class Assignment(keystone_assignment.AssignmentDriverV9):
             if inherited_to_projects is not None:
                 query = query.filter_by(inherited=inherited_to_projects)
 
-            return [denormalize_role(ref) for ref in query.all()]
+            return [self._denormalize_role_assignment(ref)
+                    for ref in query.all()]
+
+    def list_inherited_role_assignments(self, domain_id, project_ids=None,
+                                        role_id=None, user_id=None,
+                                        group_ids=None):
+        with sql.transaction() as session:
+            domain_types = self._get_assignment_types(
+                user_id, group_ids, None, domain_id)
+            target_filter = sqlalchemy.and_(
+                RoleAssignment.target_id == domain_id,
+                RoleAssignment.type.in_(domain_types))
+            if project_ids:
+                project_types = self._get_assignment_types(
+                    user_id, group_ids, project_ids, None)
+                target_filter = sqlalchemy.or_(
+                    target_filter,
+                    sqlalchemy.and_(
+                        RoleAssignment.target_id.in_(project_ids),
+                        RoleAssignment.type.in_(project_types)))
+
+            query = self._filter_by_role_and_actors(
+                session.query(RoleAssignment), role_id, user_id, group_ids)
+            query = query.filter(target_filter).filter_by(inherited=True)
+
+            return [self._denormalize_role_assignment(ref)
+                    for ref in query.all()]
 
     def delete_project_assignments(self, project_id):
         with sql.transaction() as session:
@@ -146,8 +146,7 @@ class RoleAssignmentV2(controller.V2Controller):
                 message=_('User roles not supported: tenant_id required'))
         roles = self.assignment_api.get_roles_for_user_and_project(
             user_id, tenant_id)
-        return {'roles': [self.role_api.get_role(x)
-                          for x in roles]}
+        return {'roles': self.role_api.get_roles(roles)}
 
     @controller.v2_deprecated
     def add_role_to_user(self, context, user_id, role_id, tenant_id=None):
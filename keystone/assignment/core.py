@@ -15,8 +15,11 @@
 """Main entry point into the Assignment service."""
 
 import abc
-import copy
+import collections
+import functools
+import itertools
 
+from dogpile.cache import api as dogpile_api
 from oslo_cache import core as oslo_cache
 from oslo_config import cfg
 from oslo_log import log
@@ -48,6 +51,51 @@ MEMOIZE_COMPUTED_ASSIGNMENTS = cache.get_memoization_decorator(
     group='role',
     region=COMPUTED_ASSIGNMENTS_REGION)
 
+# The role assignments computed into the region above also depend on whether
+# inheritance and role inference are enabled. These are the values of those
+# settings the last time the region was read.
+_COMPUTED_ASSIGNMENTS_SETTINGS = {}
+
+# This builds a discrete cache region dedicated to the role inference rules
+# implied by a given prior role. Any write operation to add or remove a role
+# inference rule (or a role itself) should invalidate this entire cache region.
+IMPLIED_ROLES_REGION = oslo_cache.create_region()
+MEMOIZE_IMPLIED_ROLES = cache.get_memoization_decorator(
+    group='role',
+    region=IMPLIED_ROLES_REGION)
+
+
+def _check_computed_assignments_settings(f):
+    """Invalidate the computed assignments region if its settings changed.
+
+    This wraps a function memoized in the computed assignments region, and
+    keeps the attributes added by the memoization (e.g. invalidate()).
+
+    """
+    @functools.wraps(f)
+    def wrapper(*args, **kwargs):
+        settings = (CONF.os_inherit.enabled, CONF.token.infer_roles)
+        previous = _COMPUTED_ASSIGNMENTS_SETTINGS.get('settings', settings)
+        _COMPUTED_ASSIGNMENTS_SETTINGS['settings'] = settings
+        if previous != settings:
+            COMPUTED_ASSIGNMENTS_REGION.invalidate()
+        return f(*args, **kwargs)
+    return wrapper
+
+
+def _copy_assignment_ref(ref):
+    """Copy an assignment ref without going through copy.deepcopy().
+
+    Assignment refs are flat dicts of ids, apart from the optional 'indirect'
+    dict (itself a flat dict of ids), so copying one level down is enough to
+    be able to modify the result without affecting the original ref.
+
+    """
+    new_ref = ref.copy()
+    if 'indirect' in new_ref:
+        new_ref['indirect'] = new_ref['indirect'].copy()
+    return new_ref
+
 
 @dependency.provider('assignment_api')
 @dependency.requires('credential_api', 'identity_api', 'resource_api',
@@ -87,16 +135,36 @@ class Manager(manager.Manager):
         self.resource_api.get_project(tenant_id)
         assignment_list = self.list_role_assignments(
             project_id=tenant_id, effective=True)
-        # Use set() to process the list to remove any duplicates
-        return list(set([x['user_id'] for x in assignment_list]))
+        # Remove any duplicates, keeping the order in which they were found
+        return list(collections.OrderedDict.fromkeys(
+            x['user_id'] for x in assignment_list))
+
+    def _invalidate_computed_assignments(self, user_id=None, group_id=None,
+                                         domain_id=None, project_id=None,
+                                         inherited_to_projects=False):
+        """Invalidate the computed assignments affected by a grant.
+
+        A non-inherited user grant only changes the roles computed for that
+        user on its own target, so only that cache entry is invalidated. Any
+        other change (e.g. an inherited grant, which affects a whole tree of
+        projects, or a group grant, which affects the roles computed for any
+        set of groups including that group) invalidates the entire computed
+        assignments cache region.
+
+        """
+        if (group_id or not user_id or inherited_to_projects or
+                not (project_id or domain_id)):
+            COMPUTED_ASSIGNMENTS_REGION.invalidate()
+            return
 
-    def _list_parent_ids_of_project(self, project_id):
-        if CONF.os_inherit.enabled:
-            return [x['id'] for x in (
-                self.resource_api.list_project_parents(project_id))]
+        if project_id:
+            self.get_roles_for_user_and_project.invalidate(
+                self, user_id, project_id)
         else:
-            return []
+            self.get_roles_for_user_and_domain.invalidate(
+                self, user_id, domain_id)
 
+    @_check_computed_assignments_settings
     @MEMOIZE_COMPUTED_ASSIGNMENTS
     def get_roles_for_user_and_project(self, user_id, tenant_id):
         """Get the roles associated with a user within given project.
@@ -105,7 +173,7 @@ class Manager(manager.Manager):
         project, as well as those by virtue of group membership or
         inheritance.
 
-        :returns: a list of role ids.
+        :returns: a tuple of role ids.
         :raises keystone.exception.ProjectNotFound: If the project doesn't
             exist.
 
@@ -113,39 +181,54 @@ class Manager(manager.Manager):
         self.resource_api.get_project(tenant_id)
         assignment_list = self.list_role_assignments(
             user_id=user_id, project_id=tenant_id, effective=True)
-        # Use set() to process the list to remove any duplicates
-        return list(set([x['role_id'] for x in assignment_list]))
+        # Remove any duplicates, keeping the order in which they were found.
+        # The result is returned as a tuple, since it is shared via the cache.
+        return tuple(collections.OrderedDict.fromkeys(
+            x['role_id'] for x in assignment_list))
 
+    @_check_computed_assignments_settings
     @MEMOIZE_COMPUTED_ASSIGNMENTS
     def get_roles_for_user_and_domain(self, user_id, domain_id):
         """Get the roles associated with a user within given domain.
 
-        :returns: a list of role ids.
+        :returns: a tuple of role ids.
         :raises keystone.exception.DomainNotFound: If the domain doesn't exist.
 
         """
         self.resource_api.get_domain(domain_id)
         assignment_list = self.list_role_assignments(
             user_id=user_id, domain_id=domain_id, effective=True)
-        # Use set() to process the list to remove any duplicates
-        return list(set([x['role_id'] for x in assignment_list]))
+        # Remove any duplicates, keeping the order in which they were found.
+        # The result is returned as a tuple, since it is shared via the cache.
+        return tuple(collections.OrderedDict.fromkeys(
+            x['role_id'] for x in assignment_list))
 
-    def get_roles_for_groups(self, group_ids, project_id=None, domain_id=None):
-        """Get a list of roles for this group on domain and/or project."""
+    @_check_computed_assignments_settings
+    @MEMOIZE_COMPUTED_ASSIGNMENTS
+    def _get_role_ids_for_groups(self, group_ids, project_id, domain_id):
+        # NOTE: group_ids is passed in as a sorted tuple, so that the same set
+        # of groups always maps onto the same cache key.
         if project_id is not None:
-            self.resource_api.get_project(project_id)
             assignment_list = self.list_role_assignments(
-                source_from_group_ids=group_ids, project_id=project_id,
+                source_from_group_ids=list(group_ids), project_id=project_id,
                 effective=True)
-        elif domain_id is not None:
+        else:
             assignment_list = self.list_role_assignments(
-                source_from_group_ids=group_ids, domain_id=domain_id,
+                source_from_group_ids=list(group_ids), domain_id=domain_id,
                 effective=True)
-        else:
+        # Use set() to process the list to remove any duplicates
+        return tuple({x['role_id'] for x in assignment_list})
+
+    def get_roles_for_groups(self, group_ids, project_id=None, domain_id=None):
+        """Get a list of roles for this group on domain and/or project."""
+        if project_id is not None:
+            self.resource_api.get_project(project_id)
+        elif domain_id is None:
             raise AttributeError(_("Must specify either domain or project"))
 
-        role_ids = list(set([x['role_id'] for x in assignment_list]))
-        return self.role_api.list_roles_from_ids(role_ids)
+        role_ids = self._get_role_ids_for_groups(
+            tuple(sorted(set(group_ids))), project_id, domain_id)
+        return self.role_api.list_roles_from_ids(list(role_ids))
 
     def add_user_to_project(self, tenant_id, user_id):
         """Add user to a tenant by creating a default role relationship.
@@ -179,7 +262,8 @@ class Manager(manager.Manager):
                 user_id,
                 tenant_id,
                 CONF.member_role_id)
-        COMPUTED_ASSIGNMENTS_REGION.invalidate()
+        self._invalidate_computed_assignments(
+            user_id=user_id, project_id=tenant_id)
 
     @notifications.role_assignment('created')
     def _add_role_to_user_and_project_adapter(self, role_id, user_id=None,
@@ -199,7 +283,8 @@ class Manager(manager.Manager):
     def add_role_to_user_and_project(self, user_id, tenant_id, role_id):
         self._add_role_to_user_and_project_adapter(
             role_id, user_id=user_id, project_id=tenant_id)
-        COMPUTED_ASSIGNMENTS_REGION.invalidate()
+        self._invalidate_computed_assignments(
+            user_id=user_id, project_id=tenant_id)
 
     def remove_user_from_project(self, tenant_id, user_id):
         """Remove user from a tenant
@@ -223,40 +308,61 @@ class Manager(manager.Manager):
             except exception.RoleNotFound:
                 LOG.debug("Removing role %s failed because it does not exist.",
                           role_id)
-        COMPUTED_ASSIGNMENTS_REGION.invalidate()
+        self._invalidate_computed_assignments(
+            user_id=user_id, project_id=tenant_id)
 
-    # TODO(henry-nash): We might want to consider list limiting this at some
-    # point in the future.
-    def list_projects_for_user(self, user_id, hints=None):
+    def _list_target_ids_for_user(self, user_id):
+        """Get the projects and domains on which a user has any role.
+
+        Both are computed from a single effective listing of the user's
+        assignments. This is not memoized, since the result also changes
+        when a project is created beneath an inherited grant, or when
+        OS-INHERIT is toggled, neither of which touches the assignments.
+
+        :returns: a tuple of (project_ids, domain_ids), each a tuple of ids.
+
+        """
         assignment_list = self.list_role_assignments(
             user_id=user_id, effective=True)
         # Use set() to process the list to remove any duplicates
-        project_ids = list(set([x['project_id'] for x in assignment_list
-                                if x.get('project_id')]))
-        return self.resource_api.list_projects_from_ids(list(project_ids))
+        project_ids = tuple({x['project_id'] for x in assignment_list
+                             if x.get('project_id')})
+        domain_ids = tuple({x['domain_id'] for x in assignment_list
+                            if x.get('domain_id')})
+        return project_ids, domain_ids
+
+    def list_effective_project_ids_for_user(self, user_id):
+        """Get the IDs of the projects on which a user has any role.
+
+        This avoids reading the project refs when only their IDs are needed.
+
+        """
+        return list(self._list_target_ids_for_user(user_id)[0])
+
+    # TODO(henry-nash): We might want to consider list limiting this at some
+    # point in the future.
+    def list_projects_for_user(self, user_id, hints=None):
+        project_ids = self.list_effective_project_ids_for_user(user_id)
+        return self.resource_api.list_projects_from_ids(project_ids)
 
     # TODO(henry-nash): We might want to consider list limiting this at some
     # point in the future.
     def list_domains_for_user(self, user_id, hints=None):
-        assignment_list = self.list_role_assignments(
-            user_id=user_id, effective=True)
-        # Use set() to process the list to remove any duplicates
-        domain_ids = list(set([x['domain_id'] for x in assignment_list
-                               if x.get('domain_id')]))
-        return self.resource_api.list_domains_from_ids(domain_ids)
+        domain_ids = self._list_target_ids_for_user(user_id)[1]
+        return self.resource_api.list_domains_from_ids(list(domain_ids))
 
     def list_domains_for_groups(self, group_ids):
         assignment_list = self.list_role_assignments(
             source_from_group_ids=group_ids, effective=True)
-        domain_ids = list(set([x['domain_id'] for x in assignment_list
-                               if x.get('domain_id')]))
+        domain_ids = list({x['domain_id'] for x in assignment_list
+                           if x.get('domain_id')})
         return self.resource_api.list_domains_from_ids(domain_ids)
 
     def list_projects_for_groups(self, group_ids):
         assignment_list = self.list_role_assignments(
             source_from_group_ids=group_ids, effective=True)
-        project_ids = list(set([x['project_id'] for x in assignment_list
-                               if x.get('project_id')]))
+        project_ids = list({x['project_id'] for x in assignment_list
+                            if x.get('project_id')})
         return self.resource_api.list_projects_from_ids(project_ids)
 
     @notifications.role_assignment('deleted')
@@ -283,7 +389,8 @@ class Manager(manager.Manager):
     def remove_role_from_user_and_project(self, user_id, tenant_id, role_id):
         self._remove_role_from_user_and_project_adapter(
             role_id, user_id=user_id, project_id=tenant_id)
-        COMPUTED_ASSIGNMENTS_REGION.invalidate()
+        self._invalidate_computed_assignments(
+            user_id=user_id, project_id=tenant_id)
 
     @notifications.internal(notifications.INVALIDATE_USER_TOKEN_PERSISTENCE)
     def _emit_invalidate_user_token_persistence(self, user_id):
@@ -305,7 +412,10 @@ class Manager(manager.Manager):
             self.resource_api.get_project(project_id)
         self.driver.create_grant(role_id, user_id, group_id, domain_id,
                                  project_id, inherited_to_projects)
-        COMPUTED_ASSIGNMENTS_REGION.invalidate()
+        self._invalidate_computed_assignments(
+            user_id=user_id, group_id=group_id, domain_id=domain_id,
+            project_id=project_id,
+            inherited_to_projects=inherited_to_projects)
 
     def get_grant(self, role_id, user_id=None, group_id=None,
                   domain_id=None, project_id=None,
@@ -383,7 +493,10 @@ class Manager(manager.Manager):
             self.resource_api.get_project(project_id)
         self.driver.delete_grant(role_id, user_id, group_id, domain_id,
                                  project_id, inherited_to_projects)
-        COMPUTED_ASSIGNMENTS_REGION.invalidate()
+        self._invalidate_computed_assignments(
+            user_id=user_id, group_id=group_id, domain_id=domain_id,
+            project_id=project_id,
+            inherited_to_projects=inherited_to_projects)
 
     # The methods _expand_indirect_assignment, _list_direct_role_assignments
     # and _list_effective_role_assignments below are only used on
@@ -392,8 +505,22 @@ class Manager(manager.Manager):
     # kept as it is in order to detect unnecessarily complex code, which is not
     # this case.
 
+    def _list_ids_with_cache(self, resolver_cache, kind, list_method,
+                             entity_id):
+        """Return the ids of the entities listed for entity_id.
+
+        The ids are remembered in resolver_cache under kind and entity_id, so
+        that list_method is only called once for any given entity.
+
+        """
+        key = (kind, entity_id)
+        if key not in resolver_cache:
+            resolver_cache[key] = [x['id'] for x in list_method(entity_id)]
+        return resolver_cache[key]
+
     def _expand_indirect_assignment(self, ref, user_id=None, project_id=None,
-                                    subtree_ids=None, expand_groups=True):
+                                    subtree_ids=None, expand_groups=True,
+                                    resolver_cache=None):
         """Returns a list of expanded role assignments.
 
         This methods is called for each discovered assignment that either needs
@@ -414,15 +541,39 @@ class Manager(manager.Manager):
         If expand_groups is True then we expand groups out to a list of
         assignments, one for each member of that group.
 
+        If resolver_cache is provided, it is used to remember the projects
+        found under any inheritance target and the members of any group, so
+        that a caller expanding many assignments on the same targets or groups
+        only asks the resource and identity APIs once.
+
         """
+        if resolver_cache is None:
+            resolver_cache = {}
+
+        def list_project_ids_in_subtree(project_id):
+            return self._list_ids_with_cache(
+                resolver_cache, 'subtree',
+                self.resource_api.list_projects_in_subtree, project_id)
+
+        def list_project_ids_in_domain(domain_id):
+            return self._list_ids_with_cache(
+                resolver_cache, 'domain',
+                self.resource_api.list_projects_in_domain, domain_id)
+
+        def list_user_ids_in_group(group_id):
+            return self._list_ids_with_cache(
+                resolver_cache, 'group',
+                self.identity_api.list_users_in_group, group_id)
+
         def create_group_assignment(base_ref, user_id):
             """Creates a group assignment from the provided ref."""
-            ref = copy.deepcopy(base_ref)
-
+            ref = {k: v for k, v in base_ref.items()
+                   if k not in ('group_id', 'indirect')}
             ref['user_id'] = user_id
 
-            indirect = ref.setdefault('indirect', {})
-            indirect['group_id'] = ref.pop('group_id')
+            indirect = dict(base_ref.get('indirect', {}))
+            indirect['group_id'] = base_ref['group_id']
+            ref['indirect'] = indirect
 
             return ref
 
@@ -464,9 +615,8 @@ class Manager(manager.Manager):
             if user_id:
                 return [create_group_assignment(ref, user_id=user_id)]
 
-            return [create_group_assignment(ref, user_id=m['id'])
-                    for m in self.identity_api.list_users_in_group(
-                        ref['group_id'])]
+            return [create_group_assignment(ref, user_id=member_id)
+                    for member_id in list_user_ids_in_group(ref['group_id'])]
 
         def expand_inherited_assignment(ref, user_id, project_id, subtree_ids,
                                         expand_groups):
@@ -526,19 +676,31 @@ class Manager(manager.Manager):
                 assignment ref.
 
                 """
-                ref = copy.deepcopy(base_ref)
-
-                indirect = ref.setdefault('indirect', {})
-                if ref.get('project_id'):
-                    indirect['project_id'] = ref.pop('project_id')
+                if base_ref.get('project_id'):
+                    target = 'project_id'
                 else:
-                    indirect['domain_id'] = ref.pop('domain_id')
-
+                    target = 'domain_id'
+                ref = {k: v for k, v in base_ref.items()
+                       if k not in (target, 'inherited_to_projects',
+                                    'indirect')}
                 ref['project_id'] = project_id
-                ref.pop('inherited_to_projects')
+
+                indirect = dict(base_ref.get('indirect', {}))
+                indirect[target] = base_ref[target]
+                ref['indirect'] = indirect
 
                 return ref
 
+            if project_id and not subtree_ids:
+                # We are only interested in the one project, so there is no
+                # target to expand - just apply the assignment to it (once
+                # per group member if we are expanding groups)
+                if 'group_id' in ref and expand_groups:
+                    return [create_inherited_assignment(group_ref, project_id)
+                            for group_ref in expand_group_assignment(
+                                ref, user_id)]
+                return [create_inherited_assignment(ref, project_id)]
+
             # Define expanded project list to which to apply this assignment
             if project_id:
                 # Since ref is an inherited assignment and we are filtering by
@@ -556,23 +718,15 @@ class Manager(manager.Manager):
                     # then only a partial tree will get the assignment.
                     if ref.get('project_id'):
                         if ref['project_id'] in project_ids:
-                            project_ids = (
-                                [x['id'] for x in
-                                    self.resource_api.list_projects_in_subtree(
-                                        ref['project_id'])])
+                            project_ids = list_project_ids_in_subtree(
+                                ref['project_id'])
             elif ref.get('domain_id'):
                 # A domain inherited assignment, so apply it to all projects
                 # in this domain
-                project_ids = (
-                    [x['id'] for x in
-                        self.resource_api.list_projects_in_domain(
-                            ref['domain_id'])])
+                project_ids = list_project_ids_in_domain(ref['domain_id'])
             else:
                 # It must be a project assignment, so apply it to its subtree
-                project_ids = (
-                    [x['id'] for x in
-                        self.resource_api.list_projects_in_subtree(
-                            ref['project_id'])])
+                project_ids = list_project_ids_in_subtree(ref['project_id'])
 
             new_refs = []
             if 'group_id' in ref:
@@ -601,7 +755,55 @@ class Manager(manager.Manager):
             return expand_group_assignment(ref, user_id)
         return [ref]
 
-    def _add_implied_roles(self, role_refs):
+    @MEMOIZE_IMPLIED_ROLES
+    def _list_implied_role_rules(self, role_id):
+        """List the role inference rules that apply to a role.
+
+        Walks the role inference graph from role_id, so that the result
+        includes the rules implied both directly and indirectly by it. Each
+        prior role is only expanded once, and a rule leading back to a role
+        already on the current path is reported as a circular reference rather
+        than followed.
+
+        :returns: a tuple of (prior_role_id, implied_role_id) pairs.
+
+        """
+        rules = []
+        expanded_role_ids = set()
+
+        def walk(prior_role_id, path):
+            expanded_role_ids.add(prior_role_id)
+            for implied_role in self.role_api.list_implied_roles(
+                    prior_role_id):
+                implied_role_id = implied_role['implied_role_id']
+                rules.append((prior_role_id, implied_role_id))
+                if implied_role_id in path:
+                    msg = _LE('Circular reference found '
+                              'role inference rules - %(prior_role_id)s.')
+                    LOG.error(msg, {'prior_role_id': prior_role_id})
+                elif implied_role_id not in expanded_role_ids:
+                    walk(implied_role_id, path | {implied_role_id})
+
+        walk(role_id, {role_id})
+        return tuple(rules)
+
+    @MEMOIZE_IMPLIED_ROLES
+    def _list_prior_role_ids(self, role_id):
+        """List the roles that directly imply a role.
+
+        :returns: a tuple of prior role ids, which is empty if role_id is not
+                  implied by any role (or the role driver does not support
+                  implied roles).
+
+        """
+        try:
+            rules = self.role_api.list_role_inference_rules()
+        except exception.NotImplemented:
+            return ()
+        return tuple(rule['prior_role_id'] for rule in rules
+                     if rule['implied_role_id'] == role_id)
+
+    def _iter_implied_roles(self, role_refs, role_id=None):
         """Expand out implied roles.
 
         The role_refs passed in have had all inheritance and group assignments
@@ -611,57 +813,81 @@ class Manager(manager.Manager):
         in the indirect dict that is part of such a duplicated ref, so that a
         caller can determine where the assignment came from.
 
+        The inference rules reachable from each distinct role are only worked
+        out once (and are cached across calls), so each ref just needs one
+        lookup rather than a walk of the role inference graph.
+
+        This is a generator, yielding the role_refs passed in followed by the
+        implied refs as they are found. If role_id is specified, only the refs
+        for that role are yielded, and no copies are made of refs for any
+        other implied role. Since role_refs is iterated over twice, it must be
+        a list. Callers should only use it when role inference
+        (CONF.token.infer_roles) is enabled.
+
         """
-        def _make_implied_ref_copy(prior_ref, implied_role_id):
-            # Create a ref for an implied role from the ref of a prior role,
-            # setting the new role_id to be the implied role and the indirect
-            # role_id to be the prior role
-            implied_ref = copy.deepcopy(prior_ref)
+        def _make_implied_ref_copy(base_ref, prior_role_id, implied_role_id):
+            # Create a ref for an implied role from the ref it is ultimately
+            # derived from, setting the new role_id to be the implied role and
+            # the indirect role_id to be the prior role
+            implied_ref = _copy_assignment_ref(base_ref)
             implied_ref['role_id'] = implied_role_id
             indirect = implied_ref.setdefault('indirect', {})
-            indirect['role_id'] = prior_ref['role_id']
+            indirect['role_id'] = prior_role_id
             return implied_ref
 
-        if not CONF.token.infer_roles:
-            return role_refs
+        def _ref_key(ref):
+            # Build a hashable key for a ref, which compares equal only when
+            # the refs themselves do, so that we can track the refs already
+            # yielded in a set rather than scanning a list. All the attributes
+            # a ref (and its indirect dict) can have are part of the key.
+            indirect = ref.get('indirect') or {}
+            return (ref['role_id'], ref.get('user_id'), ref.get('group_id'),
+                    ref.get('project_id'), ref.get('domain_id'),
+                    ref.get('inherited_to_projects'),
+                    indirect.get('role_id'), indirect.get('group_id'),
+                    indirect.get('project_id'), indirect.get('domain_id'))
+
+        for ref in role_refs:
+            if not role_id or ref['role_id'] == role_id:
+                yield ref
+
         try:
-            implied_roles_cache = {}
-            role_refs_to_check = list(role_refs)
-            ref_results = list(role_refs)
-            checked_role_refs = list()
-            while(role_refs_to_check):
-                next_ref = role_refs_to_check.pop()
-                checked_role_refs.append(next_ref)
-                next_role_id = next_ref['role_id']
-                if next_role_id in implied_roles_cache:
-                    implied_roles = implied_roles_cache[next_role_id]
-                else:
-                    implied_roles = (
-                        self.role_api.list_implied_roles(next_role_id))
-                    implied_roles_cache[next_role_id] = implied_roles
-                for implied_role in implied_roles:
-                    implied_ref = (
-                        _make_implied_ref_copy(
-                            next_ref, implied_role['implied_role_id']))
-                    if implied_ref in checked_role_refs:
-                        msg = _LE('Circular reference found '
-                                  'role inference rules - %(prior_role_id)s.')
-                        LOG.error(msg, {'prior_role_id': next_ref['role_id']})
-                    else:
-                        ref_results.append(implied_ref)
-                        role_refs_to_check.append(implied_ref)
+            implied_rules_cache = {}
+            yielded_role_refs = set()
+            for ref in role_refs:
+                ref_role_id = ref['role_id']
+                if ref_role_id not in implied_rules_cache:
+                    implied_rules_cache[ref_role_id] = (
+                        self._list_implied_role_rules(ref_role_id))
+                for prior_role_id, implied_role_id in (
+                        implied_rules_cache[ref_role_id]):
+                    if role_id and implied_role_id != role_id:
+                        continue
+                    implied_ref = _make_implied_ref_copy(
+                        ref, prior_role_id, implied_role_id)
+                    ref_key = _ref_key(implied_ref)
+                    if ref_key not in yielded_role_refs:
+                        yielded_role_refs.add(ref_key)
+                        yield implied_ref
         except exception.NotImplemented:
             LOG.error('Role driver does not support implied roles.')
 
-        return ref_results
-
     def _filter_by_role_id(self, role_id, ref_results):
         # if we arrive here, we need to filer by role_id.
-        filter_results = []
-        for ref in ref_results:
-            if ref['role_id'] == role_id:
-                filter_results.append(ref)
-        return filter_results
+        return [ref for ref in ref_results if ref['role_id'] == role_id]
+
+    def _get_project_ids_of_interest(self, project_id, subtree_ids):
+        """Return the ids of the projects to filter assignments on.
+
+        :returns: None if project_id is not specified, otherwise a list of
+                  project_id plus any project in subtree_ids.
+
+        """
+        if not project_id:
+            return None
+        if subtree_ids:
+            return subtree_ids + [project_id]
+        return [project_id]
 
     def _list_effective_role_assignments(self, role_id, user_id, group_id,
                                          domain_id, project_id, subtree_ids,
@@ -716,17 +942,13 @@ class Manager(manager.Manager):
                               that affect this domain - by definition this will
                               not include any inherited assignments
 
-            :returns: List of assignments matching the criteria. Any inherited
-                      or group assignments that could affect the resulting
-                      response are included.
+            :returns: Iterable of assignments matching the criteria. Any
+                      inherited or group assignments that could affect the
+                      resulting response are included.
 
             """
-            project_ids_of_interest = None
-            if project_id:
-                if subtree_ids:
-                    project_ids_of_interest = subtree_ids + [project_id]
-                else:
-                    project_ids_of_interest = [project_id]
+            project_ids_of_interest = self._get_project_ids_of_interest(
+                project_id, subtree_ids)
 
             # List direct project role assignments
             non_inherited_refs = []
@@ -747,35 +969,35 @@ class Manager(manager.Manager):
                     # assignments from their common domain or from any of
                     # their parents projects.
 
-                    # List inherited assignments from the project's domain
-                    proj_domain_id = self.resource_api.get_project(
-                        project_id)['domain_id']
-                    inherited_refs += self.driver.list_role_assignments(
-                        role_id=role_id, domain_id=proj_domain_id,
-                        user_id=user_id, group_ids=group_ids,
-                        inherited_to_projects=True)
-
                     # For inherited assignments from projects, since we know
                     # they are from the same tree the only places these can
                     # come from are from parents of the main project or
                     # inherited assignments on the project or subtree itself.
-                    source_ids = [project['id'] for project in
-                                  self.resource_api.list_project_parents(
-                                      project_id)]
+                    source_ids = list(self._list_ids_with_cache(
+                        resolver_cache, 'parents',
+                        self.resource_api.list_project_parents, project_id))
                     if subtree_ids:
                         source_ids += project_ids_of_interest
-                    if source_ids:
-                        inherited_refs += self.driver.list_role_assignments(
-                            role_id=role_id, project_ids=source_ids,
-                            user_id=user_id, group_ids=group_ids,
-                            inherited_to_projects=True)
+
+                    # List inherited assignments from the project's domain
+                    # together with those from the projects above
+                    domain_key = ('project_domain', project_id)
+                    if domain_key not in resolver_cache:
+                        resolver_cache[domain_key] = (
+                            self.resource_api.get_project(
+                                project_id)['domain_id'])
+                    inherited_refs = (
+                        self.driver.list_inherited_role_assignments(
+                            resolver_cache[domain_key],
+                            project_ids=source_ids, role_id=role_id,
+                            user_id=user_id, group_ids=group_ids))
                 else:
                     # List inherited assignments without filtering by target
                     inherited_refs = self.driver.list_role_assignments(
                         role_id=role_id, user_id=user_id, group_ids=group_ids,
                         inherited_to_projects=True)
 
-            return non_inherited_refs + inherited_refs
+            return itertools.chain(non_inherited_refs, inherited_refs)
 
         # If filtering by group or inherited domain assignment the list is
         # guaranteed to be empty
@@ -793,12 +1015,22 @@ class Manager(manager.Manager):
         # relevant, since domains don't inherit assignments
         inherited = False if domain_id else inherited
 
+        # Targets resolved while listing and expanding the assignments are
+        # remembered here, so that each is only looked up once per call
+        resolver_cache = {}
+
         # List user or explicit group assignments.
         # Due to the need to expand implied roles, this call will skip
-        # filtering by role_id and instead return the whole set of roles.
-        # Matching on the specified role is performed at the end.
+        # filtering by role_id and instead return the whole set of roles,
+        # unless no other role can imply the specified one. Matching on the
+        # specified role is performed at the end.
+        driver_role_id = None
+        if role_id and not (CONF.token.infer_roles and
+                            self._list_prior_role_ids(role_id)):
+            driver_role_id = role_id
         direct_refs = list_role_assignments_for_actor(
-            role_id=None, user_id=user_id, group_ids=source_from_group_ids,
+            role_id=driver_role_id, user_id=user_id,
+            group_ids=source_from_group_ids,
             project_id=project_id, subtree_ids=subtree_ids,
             domain_id=domain_id, inherited=inherited)
 
@@ -810,20 +1042,25 @@ class Manager(manager.Manager):
             group_ids = self._get_group_ids_for_user_id(user_id)
             if group_ids:
                 group_refs = list_role_assignments_for_actor(
-                    role_id=None, project_id=project_id,
+                    role_id=driver_role_id, project_id=project_id,
                     subtree_ids=subtree_ids, group_ids=group_ids,
                     domain_id=domain_id, inherited=inherited)
 
-        # Expand grouping and inheritance on retrieved role assignments
+        # Expand grouping and inheritance on retrieved role assignments,
+        # sharing the targets resolved so far across all of them
         refs = []
         expand_groups = (source_from_group_ids is None)
-        for ref in (direct_refs + group_refs):
+        for ref in itertools.chain(direct_refs, group_refs):
             refs += self._expand_indirect_assignment(
-                ref, user_id, project_id, subtree_ids, expand_groups)
+                ref, user_id, project_id, subtree_ids, expand_groups,
+                resolver_cache=resolver_cache)
 
-        refs = self._add_implied_roles(refs)
+        # Only go through implied role expansion if role inference is
+        # enabled, otherwise the expanded refs are already the final list.
+        if CONF.token.infer_roles:
+            return list(self._iter_implied_roles(refs, role_id=role_id))
         if role_id:
-            refs = self._filter_by_role_id(role_id, refs)
+            return self._filter_by_role_id(role_id, refs)
 
         return refs
 
@@ -838,16 +1075,11 @@ class Manager(manager.Manager):
 
         """
         group_ids = [group_id] if group_id else None
-        project_ids_of_interest = None
-        if project_id:
-            if subtree_ids:
-                project_ids_of_interest = subtree_ids + [project_id]
-            else:
-                project_ids_of_interest = [project_id]
-
         return self.driver.list_role_assignments(
             role_id=role_id, user_id=user_id, group_ids=group_ids,
-            domain_id=domain_id, project_ids=project_ids_of_interest,
+            domain_id=domain_id,
+            project_ids=self._get_project_ids_of_interest(
+                project_id, subtree_ids),
             inherited_to_projects=inherited)
 
     def list_role_assignments(self, role_id=None, user_id=None, group_id=None,
@@ -914,42 +1146,73 @@ class Manager(manager.Manager):
             return self._get_names_from_role_assignments(role_assignments)
         return role_assignments
 
+    def _list_refs_from_ids(self, list_from_ids, get_ref, ref_ids):
+        refs = {ref['id']: ref for ref in list_from_ids(list(ref_ids))}
+        # The bulk APIs silently drop ids they cannot find, so fall back to
+        # the single entity getter to raise the usual NotFound exception.
+        for ref_id in ref_ids - set(refs):
+            refs[ref_id] = get_ref(ref_id)
+        return refs
+
     def _get_names_from_role_assignments(self, role_assignments):
-        role_assign_list = []
+        # Resolve each distinct entity only once, in bulk where the backend
+        # supports it, rather than once per assignment that refers to it.
+        ids = collections.defaultdict(set)
+        for role_asgmt in role_assignments:
+            for id_type in ('domain_id', 'user_id', 'group_id', 'project_id',
+                            'role_id'):
+                if id_type in role_asgmt:
+                    ids[id_type].add(role_asgmt[id_type])
+
+        users = {user_id: self.identity_api.get_user(user_id)
+                 for user_id in ids['user_id']}
+        groups = {group_id: self.identity_api.get_group(group_id)
+                  for group_id in ids['group_id']}
+        projects = self._list_refs_from_ids(
+            self.resource_api.list_projects_from_ids,
+            self.resource_api.get_project, ids['project_id'])
+        roles = self._list_refs_from_ids(
+            self.role_api.list_roles_from_ids,
+            self.role_api.get_role, ids['role_id'])
+
+        domain_ids = set(ids['domain_id'])
+        for refs in (users, groups, projects):
+            domain_ids.update(ref['domain_id'] for ref in refs.values())
+        domains = self._list_refs_from_ids(
+            self.resource_api.list_domains_from_ids,
+            self.resource_api.get_domain, domain_ids)
 
+        role_assign_list = []
         for role_asgmt in role_assignments:
             new_assign = {}
             for id_type, id_ in role_asgmt.items():
                 if id_type == 'domain_id':
-                    _domain = self.resource_api.get_domain(id_)
+                    _domain = domains[id_]
                     new_assign['domain_id'] = _domain['id']
                     new_assign['domain_name'] = _domain['name']
                 elif id_type == 'user_id':
-                    _user = self.identity_api.get_user(id_)
+                    _user = users[id_]
                     new_assign['user_id'] = _user['id']
                     new_assign['user_name'] = _user['name']
                     new_assign['user_domain_id'] = _user['domain_id']
                     new_assign['user_domain_name'] = (
-                        self.resource_api.get_domain(_user['domain_id'])
-                        ['name'])
+                        domains[_user['domain_id']]['name'])
                 elif id_type == 'group_id':
-                    _group = self.identity_api.get_group(id_)
+                    _group = groups[id_]
                     new_assign['group_id'] = _group['id']
                     new_assign['group_name'] = _group['name']
                     new_assign['group_domain_id'] = _group['domain_id']
                     new_assign['group_domain_name'] = (
-                        self.resource_api.get_domain(_group['domain_id'])
-                        ['name'])
+                        domains[_group['domain_id']]['name'])
                 elif id_type == 'project_id':
-                    _project = self.resource_api.get_project(id_)
+                    _project = projects[id_]
                     new_assign['project_id'] = _project['id']
                     new_assign['project_name'] = _project['name']
                     new_assign['project_domain_id'] = _project['domain_id']
                     new_assign['project_domain_name'] = (
-                        self.resource_api.get_domain(_project['domain_id'])
-                        ['name'])
+                        domains[_project['domain_id']]['name'])
                 elif id_type == 'role_id':
-                    _role = self.role_api.get_role(id_)
+                    _role = roles[id_]
                     new_assign['role_id'] = _role['id']
                     new_assign['role_name'] = _role['name']
             role_assign_list.append(new_assign)
@@ -958,10 +1221,10 @@ class Manager(manager.Manager):
     def delete_tokens_for_role_assignments(self, role_id):
         assignments = self.list_role_assignments(role_id=role_id)
 
-        # Iterate over the assignments for this role and build the list of
+        # Iterate over the assignments for this role and build the sets of
         # user or user+project IDs for the tokens we need to delete
         user_ids = set()
-        user_and_project_ids = list()
+        user_and_project_ids = set()
         for assignment in assignments:
             # If we have a project assignment, then record both the user and
             # project IDs so we can target the right token to delete. If it is
@@ -971,11 +1234,10 @@ class Manager(manager.Manager):
             # trying to delete tokens for each project in the domain.
             if 'user_id' in assignment:
                 if 'project_id' in assignment:
-                    user_and_project_ids.append(
+                    user_and_project_ids.add(
                         (assignment['user_id'], assignment['project_id']))
                 elif 'domain_id' in assignment:
-                    self._emit_invalidate_user_token_persistence(
-                        assignment['user_id'])
+                    user_ids.add(assignment['user_id'])
             elif 'group_id' in assignment:
                 # Add in any users for this group, being tolerant of any
                 # cross-driver database integrity errors.
@@ -997,22 +1259,23 @@ class Manager(manager.Manager):
                     continue
 
                 if 'project_id' in assignment:
-                    for user in users:
-                        user_and_project_ids.append(
-                            (user['id'], assignment['project_id']))
+                    user_and_project_ids.update(
+                        (user['id'], assignment['project_id'])
+                        for user in users)
                 elif 'domain_id' in assignment:
-                    for user in users:
-                        self._emit_invalidate_user_token_persistence(
-                            user['id'])
+                    user_ids.update(user['id'] for user in users)
 
-        # Now process the built up lists.  Before issuing calls to delete any
+        # Now process the built up sets.  Before issuing calls to delete any
         # tokens, let's try and minimize the number of calls by pruning out
         # any user+project deletions where a general token deletion for that
         # same user is also planned.
-        user_and_project_ids_to_action = []
-        for user_and_project_id in user_and_project_ids:
-            if user_and_project_id[0] not in user_ids:
-                user_and_project_ids_to_action.append(user_and_project_id)
+        for user_id in user_ids:
+            self._emit_invalidate_user_token_persistence(user_id)
+
+        user_and_project_ids_to_action = [
+            (user_id, project_id)
+            for user_id, project_id in user_and_project_ids
+            if user_id not in user_ids]
 
         for user_id, project_id in user_and_project_ids_to_action:
             self._emit_invalidate_user_project_tokens_notification(
@@ -1289,7 +1552,26 @@ class AssignmentDriverV9(AssignmentDriverBase):
 
     """
 
-    pass
+    def list_inherited_role_assignments(self, domain_id, project_ids=None,
+                                        role_id=None, user_id=None,
+                                        group_ids=None):
+        """Returns a list of inherited role assignments on a set of targets.
+
+        Lists the inherited assignments on either the domain or any of the
+        projects specified, filtered by the other parameters in the same way
+        as list_role_assignments. This default implementation makes one call
+        to list_role_assignments per kind of target, drivers able to retrieve
+        both in one go should override it.
+
+        """
+        refs = self.list_role_assignments(
+            role_id=role_id, domain_id=domain_id, user_id=user_id,
+            group_ids=group_ids, inherited_to_projects=True)
+        if project_ids:
+            refs += self.list_role_assignments(
+                role_id=role_id, project_ids=project_ids, user_id=user_id,
+                group_ids=group_ids, inherited_to_projects=True)
+        return refs
 
 
 class V9AssignmentWrapperForV8Driver(AssignmentDriverV9):
@@ -1424,21 +1706,67 @@ class RoleManager(manager.Manager):
     def get_role(self, role_id):
         return self.driver.get_role(role_id)
 
+    def get_roles(self, role_ids):
+        """Get the roles for a list of role ids.
+
+        Any roles not already cached by get_role are read from the driver in
+        a single call, and then cached in the same way.
+
+        :returns: a list of role refs, in the order of role_ids. Each ref is
+            a copy, so callers can modify it without affecting the cache.
+        :raises keystone.exception.RoleNotFound: If any of the roles doesn't
+            exist.
+
+        """
+        roles = {}
+        missing_ids = set()
+        for role_id in role_ids:
+            if role_id in roles or role_id in missing_ids:
+                continue
+            role = self.get_role.get(self, role_id)
+            if role is dogpile_api.NO_VALUE:
+                missing_ids.add(role_id)
+            else:
+                roles[role_id] = role
+
+        if missing_ids:
+            for role in self.driver.list_roles_from_ids(list(missing_ids)):
+                if MEMOIZE.should_cache(role):
+                    self.get_role.set(role, self, role['id'])
+                roles[role['id']] = role
+            # Let get_role raise the usual RoleNotFound for any role the
+            # driver did not return
+            for role_id in missing_ids - set(roles):
+                roles[role_id] = self.get_role(role_id)
+
+        return [dict(roles[role_id]) for role_id in role_ids]
+
     def create_role(self, role_id, role, initiator=None):
         ret = self.driver.create_role(role_id, role)
         notifications.Audit.created(self._ROLE, role_id, initiator)
         if MEMOIZE.should_cache(ret):
             self.get_role.set(ret, self, role_id)
+        self._list_all_roles.invalidate(self)
         return ret
 
     @manager.response_truncated
     def list_roles(self, hints=None):
-        return self.driver.list_roles(hints or driver_hints.Hints())
+        if hints is None:
+            # The unfiltered list is used internally, for instance when
+            # building tokens, so serve it from the cache. Return copies, so
+            # that callers modifying the refs don't modify the cached ones.
+            return [dict(role) for role in self._list_all_roles()]
+        return self.driver.list_roles(hints)
+
+    @MEMOIZE
+    def _list_all_roles(self):
+        return self.driver.list_roles(driver_hints.Hints())
 
     def update_role(self, role_id, role, initiator=None):
         ret = self.driver.update_role(role_id, role)
         notifications.Audit.updated(self._ROLE, role_id, initiator)
         self.get_role.invalidate(self, role_id)
+        self._list_all_roles.invalidate(self)
         return ret
 
     def delete_role(self, role_id, initiator=None):
@@ -1447,6 +1775,8 @@ class RoleManager(manager.Manager):
         self.driver.delete_role(role_id)
         notifications.Audit.deleted(self._ROLE, role_id, initiator)
         self.get_role.invalidate(self, role_id)
+        self._list_all_roles.invalidate(self)
+        IMPLIED_ROLES_REGION.invalidate()
         COMPUTED_ASSIGNMENTS_REGION.invalidate()
 
     # TODO(ayoung): Add notification
@@ -1457,13 +1787,19 @@ class RoleManager(manager.Manager):
             raise exception.InvalidImpliedRole(role_id=implied_role_id)
         response = self.driver.create_implied_role(
             prior_role_id, implied_role_id)
+        IMPLIED_ROLES_REGION.invalidate()
         COMPUTED_ASSIGNMENTS_REGION.invalidate()
         return response
 
     def delete_implied_role(self, prior_role_id, implied_role_id):
         self.driver.delete_implied_role(prior_role_id, implied_role_id)
+        IMPLIED_ROLES_REGION.invalidate()
         COMPUTED_ASSIGNMENTS_REGION.invalidate()
 
+    @MEMOIZE_IMPLIED_ROLES
+    def list_implied_roles(self, prior_role_id):
+        return self.driver.list_implied_roles(prior_role_id)
+
 
 # The RoleDriverBase class is the set of driver methods from earlier
 # drivers that we still support, that have not been removed or modified. This
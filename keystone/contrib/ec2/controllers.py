@@ -157,7 +157,7 @@ class Ec2ControllerCommon(object):
         if not roles:
             raise exception.Unauthorized(
                 message=_('User not valid for tenant.'))
-        roles_ref = [self.role_api.get_role(role_id) for role_id in roles]
+        roles_ref = self.role_api.get_roles(roles)
 
         catalog_ref = self.catalog_api.get_catalog(
             user_ref['id'], tenant_ref['id'])
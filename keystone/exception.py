@@ -49,6 +49,12 @@ class Error(Exception):
     Child classes should define an HTTP status code, title, and a
     message_format.
 
+    The message is only built when it is first needed (e.g. when the
+    exception is rendered, logged or its args are read), since many of
+    these exceptions are caught internally and never shown. As a result, a
+    message_format given insufficient kwargs is only detected at that
+    point, rather than where the exception is raised.
+
     """
 
     code = None
@@ -56,17 +62,51 @@ class Error(Exception):
     message_format = None
 
     def __init__(self, message=None, **kwargs):
+        self._message = message
+        self._message_kwargs = kwargs
+        self._message_built = False
+        super(Error, self).__init__()
+
+    def _ensure_message(self):
+        if not self._message_built:
+            # Store the message as the exception's native args, so that the
+            # standard str(), unicode() and repr() behaviour applies to it.
+            Exception.args.__set__(self, (self._get_message(),))
+            self._message_built = True
+
+    @property
+    def args(self):
+        self._ensure_message()
+        return Exception.args.__get__(self)
+
+    @args.setter
+    def args(self, value):
+        Exception.args.__set__(self, value)
+        self._message_built = True
+
+    def __str__(self):
+        self._ensure_message()
+        return super(Error, self).__str__()
+
+    if six.PY2:
+        def __unicode__(self):
+            self._ensure_message()
+            return super(Error, self).__unicode__()
+
+    def __repr__(self):
+        self._ensure_message()
+        return super(Error, self).__repr__()
+
+    def _get_message(self):
         try:
-            message = self._build_message(message, **kwargs)
+            return self._build_message(self._message, **self._message_kwargs)
         except KeyError:
             # if you see this warning in your logs, please raise a bug report
             if _FATAL_EXCEPTION_FORMAT_ERRORS:
                 raise
             else:
                 LOG.warning(_LW('missing exception kwargs (programmer error)'))
-                message = self.message_format
-
-        super(Error, self).__init__(message)
+                return self.message_format
 
     def _build_message(self, message, **kwargs):
         """Builds and returns an exception message.
@@ -143,20 +143,17 @@ class Manager(manager.Manager):
                     % {'domain_id': domain['id'],
                        'parent_domain_id': parent_ref.get('domain_id')})
 
-    def _find_domain_id(self, project_ref):
-        parent_ref = self.get_project(project_ref['parent_id'])
-        return parent_ref['domain_id']
-
-    def _enforce_project_constraints(self, project_ref, parent_id):
-        parent_ref = self.get_project(parent_id) if parent_id else None
+    def _enforce_project_constraints(self, project_ref, parent_ref):
         if project_ref.get('is_domain'):
             self._assert_is_domain_project_constraints(project_ref, parent_ref)
         else:
             self._assert_regular_project_constraints(project_ref, parent_ref)
 
         # The whole hierarchy must be enabled
-        if parent_id:
-            parents_list = self.list_project_parents(parent_id)
+        if parent_ref:
+            # NOTE: parent_ref has already been fetched, so there is no need
+            # to validate its id again through list_project_parents().
+            parents_list = self.driver.list_project_parents(parent_ref['id'])
             parents_list.append(parent_ref)
             for ref in parents_list:
                 if not ref.get('enabled', True):
@@ -198,12 +195,12 @@ class Manager(manager.Manager):
         # If this is a non-domain top level project,then the domain_id must
         # have been specified by the caller (this is checked as part of the
         # project constraints)
-        domain_id = project.get('domain_id')
         parent_id = project.get('parent_id')
-        if not domain_id and parent_id:
-            project['domain_id'] = self._find_domain_id(project)
+        parent_ref = self.get_project(parent_id) if parent_id else None
+        if not project.get('domain_id') and parent_ref:
+            project['domain_id'] = parent_ref['domain_id']
 
-        self._enforce_project_constraints(project, parent_id)
+        self._enforce_project_constraints(project, parent_ref)
 
         ret = self.driver.create_project(project_id, project)
         notifications.Audit.created(self._PROJECT, project_id, initiator)
@@ -277,7 +274,9 @@ class Manager(manager.Manager):
                              'disabled parents') % project_id)
 
     def _assert_whole_subtree_is_disabled(self, project_id):
-        subtree_list = self.list_projects_in_subtree(project_id)
+        # The project is known to exist, so read its subtree straight from
+        # the driver rather than validating project_id again.
+        subtree_list = self.driver.list_projects_in_subtree(project_id)
         for ref in subtree_list:
             if ref.get('enabled', True):
                 raise exception.ForbiddenAction(
@@ -378,8 +377,8 @@ class Manager(manager.Manager):
         return ret
 
     def _filter_projects_list(self, projects_list, user_id):
-        user_projects = self.assignment_api.list_projects_for_user(user_id)
-        user_projects_ids = set([proj['id'] for proj in user_projects])
+        user_projects_ids = set(
+            self.assignment_api.list_effective_project_ids_for_user(user_id))
         # Keep only the projects present in user_projects
         return [proj for proj in projects_list
                 if proj['id'] in user_projects_ids]
@@ -404,16 +403,18 @@ class Manager(manager.Manager):
         # NOTE(rodrigods): we don't rely in the order of the projects returned
         # by the list_project_parents() method. Thus, we create a project cache
         # (parents_by_id) in order to access each parent in constant time and
-        # traverse up the hierarchy.
-        def traverse_parents_hierarchy(project):
-            parent_id = project.get('parent_id')
-            if not parent_id:
-                return None
-
-            parent = parents_by_id[parent_id]
-            return {parent_id: traverse_parents_hierarchy(parent)}
+        # traverse up the hierarchy. Since the parents form a single chain,
+        # the nested dictionary is built from the top level project down.
+        parent_ids = []
+        parent_id = project.get('parent_id')
+        while parent_id:
+            parent_ids.append(parent_id)
+            parent_id = parents_by_id[parent_id].get('parent_id')
 
-        return traverse_parents_hierarchy(project)
+        parents_as_ids = None
+        for parent_id in reversed(parent_ids):
+            parents_as_ids = {parent_id: parents_as_ids}
+        return parents_as_ids
 
     def get_project_parents_as_ids(self, project):
         """Gets the IDs from the parents from a given project.
@@ -500,10 +501,7 @@ class Manager(manager.Manager):
             for proj in projects_list:
                 parent_id = proj.get('parent_id')
                 if parent_id:
-                    if parent_id in projects_by_parent:
-                        projects_by_parent[parent_id].append(proj)
-                    else:
-                        projects_by_parent[parent_id] = [proj]
+                    projects_by_parent.setdefault(parent_id, []).append(proj)
             return projects_by_parent
 
         subtree_list = self.list_projects_in_subtree(project_id)
@@ -623,7 +621,7 @@ class Manager(manager.Manager):
         associated with them as well as revoking any relevant tokens.
 
         """
-        def _delete_projects(project, projects, examined):
+        def _delete_projects(project, projects_by_parent, examined):
             if project['id'] in examined:
                 msg = _LE('Circular reference or a repeated entry found '
                           'projects hierarchy - %(project_id)s.')
@@ -631,10 +629,8 @@ class Manager(manager.Manager):
                 return
 
             examined.add(project['id'])
-            children = [proj for proj in projects
-                        if proj.get('parent_id') == project['id']]
-            for proj in children:
-                _delete_projects(proj, projects, examined)
+            for proj in projects_by_parent.get(project['id'], []):
+                _delete_projects(proj, projects_by_parent, examined)
 
             try:
                 self.delete_project(project['id'])
@@ -647,11 +643,21 @@ class Manager(manager.Manager):
 
         proj_refs = self.list_projects_in_domain(domain_id)
 
+        # Index the projects by parent once, so finding the children of each
+        # project does not require a scan of the whole domain.
+        roots = []
+        projects_by_parent = {}
+        for proj in proj_refs:
+            parent_id = proj.get('parent_id')
+            if parent_id is None:
+                roots.append(proj)
+            else:
+                projects_by_parent.setdefault(parent_id, []).append(proj)
+
         # Deleting projects recursively
-        roots = [x for x in proj_refs if x.get('parent_id') is None]
         examined = set()
         for project in roots:
-            _delete_projects(project, proj_refs, examined)
+            _delete_projects(project, projects_by_parent, examined)
 
     @manager.response_truncated
     def list_projects(self, hints=None):
@@ -38,6 +38,10 @@ def load_backends():
     cache.apply_invalidation_patch(
         region=assignment.COMPUTED_ASSIGNMENTS_REGION,
         region_name=assignment.COMPUTED_ASSIGNMENTS_REGION.name)
+    cache.configure_cache(region=assignment.IMPLIED_ROLES_REGION)
+    cache.apply_invalidation_patch(
+        region=assignment.IMPLIED_ROLES_REGION,
+        region_name=assignment.IMPLIED_ROLES_REGION.name)
 
     # Ensure that the assignment driver is created before the resource manager.
     # The default resource driver depends on assignment.
@@ -1053,6 +1053,67 @@ class IdentityTests(AssignmentTestHelperMixin):
             domain_id=new_domain['id'])
         self.assertEqual(0, len(roles_ref))
 
+    def test_group_grant_invalidates_member_computed_roles(self):
+        new_domain = unit.new_domain_ref()
+        self.resource_api.create_domain(new_domain['id'], new_domain)
+        new_user = unit.new_user_ref(domain_id=new_domain['id'])
+        new_user = self.identity_api.create_user(new_user)
+        new_group = unit.new_group_ref(domain_id=new_domain['id'])
+        new_group = self.identity_api.create_group(new_group)
+        self.identity_api.add_user_to_group(new_user['id'], new_group['id'])
+
+        # Prime the cache of computed roles for the member
+        roles_ids = self.assignment_api.get_roles_for_user_and_domain(
+            new_user['id'], new_domain['id'])
+        self.assertEqual(0, len(roles_ids))
+
+        self.assignment_api.create_grant(group_id=new_group['id'],
+                                         domain_id=new_domain['id'],
+                                         role_id='member')
+        roles_ids = self.assignment_api.get_roles_for_user_and_domain(
+            new_user['id'], new_domain['id'])
+        self.assertEqual([self.role_member['id']], list(roles_ids))
+
+        self.assignment_api.delete_grant(group_id=new_group['id'],
+                                         domain_id=new_domain['id'],
+                                         role_id='member')
+        roles_ids = self.assignment_api.get_roles_for_user_and_domain(
+            new_user['id'], new_domain['id'])
+        self.assertEqual(0, len(roles_ids))
+
+    def test_user_grant_invalidates_computed_roles(self):
+        new_project = unit.new_project_ref(domain_id=DEFAULT_DOMAIN_ID)
+        self.resource_api.create_project(new_project['id'], new_project)
+        new_user = unit.new_user_ref(domain_id=DEFAULT_DOMAIN_ID)
+        new_user = self.identity_api.create_user(new_user)
+
+        # Prime the cache of computed roles for the user
+        roles_ids = self.assignment_api.get_roles_for_user_and_project(
+            new_user['id'], new_project['id'])
+        self.assertEqual(0, len(roles_ids))
+        self.assertEqual(
+            0, len(self.assignment_api.list_projects_for_user(new_user['id'])))
+
+        self.assignment_api.create_grant(user_id=new_user['id'],
+                                         project_id=new_project['id'],
+                                         role_id='member')
+        roles_ids = self.assignment_api.get_roles_for_user_and_project(
+            new_user['id'], new_project['id'])
+        self.assertEqual([self.role_member['id']], list(roles_ids))
+        user_projects = self.assignment_api.list_projects_for_user(
+            new_user['id'])
+        self.assertEqual([new_project['id']],
+                         [x['id'] for x in user_projects])
+
+        self.assignment_api.delete_grant(user_id=new_user['id'],
+                                         project_id=new_project['id'],
+                                         role_id='member')
+        roles_ids = self.assignment_api.get_roles_for_user_and_project(
+            new_user['id'], new_project['id'])
+        self.assertEqual(0, len(roles_ids))
+        self.assertEqual(
+            0, len(self.assignment_api.list_projects_for_user(new_user['id'])))
+
     def test_get_roles_for_user_and_domain_returns_not_found(self):
         """Test errors raised when getting roles for user on a domain.
 
@@ -2078,6 +2139,16 @@ class IdentityTests(AssignmentTestHelperMixin):
             self.user_foo['id'])
         self.assertIn(self.tenant_baz, tenants)
 
+    def test_list_effective_project_ids_for_user(self):
+        self.assignment_api.add_user_to_project(self.tenant_baz['id'],
+                                                self.user_foo['id'])
+        project_ids = self.assignment_api.list_effective_project_ids_for_user(
+            self.user_foo['id'])
+        tenants = self.assignment_api.list_projects_for_user(
+            self.user_foo['id'])
+        self.assertIn(self.tenant_baz['id'], project_ids)
+        self.assertItemsEqual([x['id'] for x in tenants], project_ids)
+
     def test_add_user_to_project_missing_default_role(self):
         self.role_api.delete_role(CONF.member_role_id)
         self.assertRaises(exception.RoleNotFound,
@@ -2758,6 +2829,29 @@ class IdentityTests(AssignmentTestHelperMixin):
                           self.resource_api.list_projects_in_subtree,
                           uuid.uuid4().hex)
 
+    def test_list_projects_in_subtree_for_user(self):
+        self.config_fixture.config(group='os_inherit', enabled=True)
+        root_project = unit.new_project_ref(domain_id=DEFAULT_DOMAIN_ID)
+        self.resource_api.create_project(root_project['id'], root_project)
+        user = unit.new_user_ref(domain_id=DEFAULT_DOMAIN_ID)
+        user = self.identity_api.create_user(user)
+        self.assignment_api.create_grant(user_id=user['id'],
+                                         project_id=root_project['id'],
+                                         role_id=self.role_admin['id'],
+                                         inherited_to_projects=True)
+
+        subtree = self.resource_api.list_projects_in_subtree(
+            root_project['id'], user_id=user['id'])
+        self.assertEqual(0, len(subtree))
+
+        # The user can access a new sub-project through the inherited grant
+        leaf_project = unit.new_project_ref(domain_id=DEFAULT_DOMAIN_ID,
+                                            parent_id=root_project['id'])
+        self.resource_api.create_project(leaf_project['id'], leaf_project)
+        subtree = self.resource_api.list_projects_in_subtree(
+            root_project['id'], user_id=user['id'])
+        self.assertEqual([leaf_project['id']], [x['id'] for x in subtree])
+
     def test_list_project_parents(self):
         projects_hierarchy = self._create_projects_hierarchy(hierarchy_size=3)
         project1 = projects_hierarchy[0]
@@ -4234,6 +4328,50 @@ class IdentityTests(AssignmentTestHelperMixin):
                                   {'name': self.role_member['name']})
         # If the previous line didn't raise an exception then the test passes.
 
+    def test_list_roles_cache_invalidated_on_role_crud(self):
+        role = unit.new_role_ref()
+        self.role_api.create_role(role['id'], role)
+        role_names = {r['id']: r['name'] for r in self.role_api.list_roles()}
+        self.assertEqual(role['name'], role_names[role['id']])
+
+        new_name = uuid.uuid4().hex
+        self.role_api.update_role(role['id'], {'name': new_name})
+        role_names = {r['id']: r['name'] for r in self.role_api.list_roles()}
+        self.assertEqual(new_name, role_names[role['id']])
+
+        self.role_api.delete_role(role['id'])
+        role_ids = [r['id'] for r in self.role_api.list_roles()]
+        self.assertNotIn(role['id'], role_ids)
+
+    def test_get_roles(self):
+        role_ids = [self.role_member['id'], self.role_admin['id'],
+                    self.role_member['id']]
+        # Have one of the roles cached by get_role already
+        self.role_api.get_role(self.role_admin['id'])
+
+        roles = self.role_api.get_roles(role_ids)
+        self.assertEqual(role_ids, [role['id'] for role in roles])
+
+        self.assertRaises(exception.RoleNotFound,
+                          self.role_api.get_roles,
+                          [self.role_member['id'], uuid.uuid4().hex])
+
+    def test_cached_roles_not_modified_through_returned_refs(self):
+        # Callers such as the token providers modify the role refs they get
+        # back, which must not leak into the cached refs.
+        role_ids = [self.role_member['id'], self.role_admin['id']]
+        for role in self.role_api.get_roles(role_ids):
+            role['name'] = uuid.uuid4().hex
+        for role in self.role_api.list_roles():
+            role['name'] = uuid.uuid4().hex
+
+        role_names = {r['id']: r['name'] for r in self.role_api.list_roles()}
+        self.assertEqual(self.role_member['name'],
+                         role_names[self.role_member['id']])
+        roles = self.role_api.get_roles(role_ids)
+        self.assertEqual([self.role_member['name'], self.role_admin['name']],
+                         [role['name'] for role in roles])
+
     def test_list_role_assignment_containing_names(self):
         # Create Refs
         new_role = unit.new_role_ref()
@@ -5792,6 +5930,38 @@ class InheritanceTests(AssignmentTestHelperMixin):
         self._test_crud_inherited_and_direct_assignment(
             group_id=group['id'], project_id=self.tenant_baz['id'])
 
+    def test_list_inherited_role_assignments_on_domain_and_projects(self):
+        role = unit.new_role_ref()
+        self.role_api.create_role(role['id'], role)
+        domain = unit.new_domain_ref()
+        self.resource_api.create_domain(domain['id'], domain)
+        user = unit.new_user_ref(domain_id=domain['id'])
+        user = self.identity_api.create_user(user)
+        project1 = unit.new_project_ref(domain_id=domain['id'])
+        self.resource_api.create_project(project1['id'], project1)
+        project2 = unit.new_project_ref(domain_id=domain['id'])
+        self.resource_api.create_project(project2['id'], project2)
+
+        # Only the inherited assignments on the domain and on project1
+        # should be listed, not those on project2 or the direct ones
+        for inherited in (True, False):
+            for target in ({'domain_id': domain['id']},
+                           {'project_id': project1['id']},
+                           {'project_id': project2['id']}):
+                self.assignment_api.create_grant(
+                    role['id'], user_id=user['id'],
+                    inherited_to_projects=inherited, **target)
+
+        refs = self.assignment_api.driver.list_inherited_role_assignments(
+            domain['id'], project_ids=[project1['id']], user_id=user['id'])
+        self.assertThat(refs, matchers.HasLength(2))
+        for target in ({'domain_id': domain['id']},
+                       {'project_id': project1['id']}):
+            ref = {'user_id': user['id'], 'role_id': role['id'],
+                   'inherited_to_projects': 'projects'}
+            ref.update(target)
+            self.assertIn(ref, refs)
+
     def test_inherited_role_grants_for_user(self):
         """Test inherited user roles.
 
@@ -5901,6 +6071,36 @@ class InheritanceTests(AssignmentTestHelperMixin):
         }
         self.execute_assignment_plan(test_plan)
 
+    def test_computed_roles_follow_os_inherit_setting(self):
+        self.config_fixture.config(group='os_inherit', enabled=True)
+        domain1 = unit.new_domain_ref()
+        self.resource_api.create_domain(domain1['id'], domain1)
+        user1 = unit.new_user_ref(domain_id=domain1['id'])
+        user1 = self.identity_api.create_user(user1)
+        project1 = unit.new_project_ref(domain_id=domain1['id'])
+        self.resource_api.create_project(project1['id'], project1)
+        self.assignment_api.create_grant(user_id=user1['id'],
+                                         domain_id=domain1['id'],
+                                         role_id=self.role_member['id'],
+                                         inherited_to_projects=True)
+
+        # Prime the cache of computed roles with inheritance enabled
+        roles_ids = self.assignment_api.get_roles_for_user_and_project(
+            user1['id'], project1['id'])
+        self.assertEqual([self.role_member['id']], list(roles_ids))
+
+        # The cached roles must not outlive the setting they were computed
+        # with
+        self.config_fixture.config(group='os_inherit', enabled=False)
+        roles_ids = self.assignment_api.get_roles_for_user_and_project(
+            user1['id'], project1['id'])
+        self.assertEqual(0, len(roles_ids))
+
+        self.config_fixture.config(group='os_inherit', enabled=True)
+        roles_ids = self.assignment_api.get_roles_for_user_and_project(
+            user1['id'], project1['id'])
+        self.assertEqual([self.role_member['id']], list(roles_ids))
+
     def test_inherited_role_grants_for_group(self):
         """Test inherited group roles.
 
@@ -6175,6 +6375,32 @@ class InheritanceTests(AssignmentTestHelperMixin):
         self.execute_assignment_cases(
             test_plan_with_os_inherit_disabled, test_data)
 
+    def test_list_projects_for_user_includes_new_inherited_projects(self):
+        self.config_fixture.config(group='os_inherit', enabled=True)
+        root_project = unit.new_project_ref(domain_id=DEFAULT_DOMAIN_ID)
+        self.resource_api.create_project(root_project['id'], root_project)
+        user = unit.new_user_ref(domain_id=DEFAULT_DOMAIN_ID)
+        user = self.identity_api.create_user(user)
+        self.assignment_api.create_grant(user_id=user['id'],
+                                         project_id=root_project['id'],
+                                         role_id=self.role_admin['id'],
+                                         inherited_to_projects=True)
+
+        # The inherited grant does not apply to the root project itself
+        user_projects = self.assignment_api.list_projects_for_user(user['id'])
+        self.assertEqual(0, len(user_projects))
+
+        # A project created beneath the grant is listed straight away
+        leaf_project = unit.new_project_ref(domain_id=DEFAULT_DOMAIN_ID,
+                                            parent_id=root_project['id'])
+        self.resource_api.create_project(leaf_project['id'], leaf_project)
+        user_projects = self.assignment_api.list_projects_for_user(user['id'])
+        self.assertEqual([leaf_project['id']],
+                         [x['id'] for x in user_projects])
+        project_ids = self.assignment_api.list_effective_project_ids_for_user(
+            user['id'])
+        self.assertEqual([leaf_project['id']], project_ids)
+
     def test_list_projects_for_user_with_inherited_group_grants(self):
         """Test inherited group roles.
 
@@ -6714,6 +6940,29 @@ class ImpliedRoleTests(AssignmentTestHelperMixin):
                           uuid.uuid4().hex,
                           uuid.uuid4().hex)
 
+    def test_list_implied_roles_cache_invalidated_on_crd(self):
+        prior_role_ref = unit.new_role_ref()
+        self.role_api.create_role(prior_role_ref['id'], prior_role_ref)
+        implied_role_ref = unit.new_role_ref()
+        self.role_api.create_role(implied_role_ref['id'], implied_role_ref)
+
+        # Prime the cache with the empty list of inference rules
+        self.assertEqual(
+            [], self.role_api.list_implied_roles(prior_role_ref['id']))
+
+        self.role_api.create_implied_role(
+            prior_role_ref['id'],
+            implied_role_ref['id'])
+        implied_roles = self.role_api.list_implied_roles(prior_role_ref['id'])
+        self.assertEqual([implied_role_ref['id']],
+                         [r['implied_role_id'] for r in implied_roles])
+
+        self.role_api.delete_implied_role(
+            prior_role_ref['id'],
+            implied_role_ref['id'])
+        self.assertEqual(
+            [], self.role_api.list_implied_roles(prior_role_ref['id']))
+
     def test_delete_implied_role_returns_not_found(self):
         self.assertRaises(exception.ImpliedRoleNotFound,
                           self.role_api.delete_implied_role,
@@ -6842,6 +7091,10 @@ class ImpliedRoleTests(AssignmentTestHelperMixin):
                  'results': [{'user': 0, 'role': 3, 'project': 0,
                               'indirect': {'role': 1}},
                              {'user': 0, 'role': 3, 'project': 1}]},
+                # Filtering by a role that is not implied by any other role
+                # only lists the assignments of that role itself
+                {'params': {'role': 0, 'effective': True},
+                 'results': [{'user': 0, 'role': 0, 'project': 0}]},
             ]
         }
         self.execute_assignment_plan(test_plan)
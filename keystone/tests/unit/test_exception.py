@@ -67,6 +67,26 @@ class ExceptionTestCase(unit.BaseTestCase):
         self.assertValidJsonRendering(e)
         self.assertIn(target, six.text_type(e))
 
+    def test_message_built_when_first_used(self):
+        # Missing kwargs are only detected once the message is needed, since
+        # building it is deferred until then
+        e = exception.ValidationError(attribute=uuid.uuid4().hex)
+        self.assertRaises(KeyError, six.text_type, e)
+
+        target = uuid.uuid4().hex
+        e = exception.NotFound(target=target)
+        self.assertIn(target, e.args[0])
+        self.assertEqual(six.text_type(e.args[0]), six.text_type(e))
+
+    def test_str_with_replaced_args(self):
+        e = exception.NotFound(target=uuid.uuid4().hex)
+        e.args = ()
+        self.assertEqual('', str(e))
+
+        message = uuid.uuid4().hex
+        e.args = (message,)
+        self.assertEqual(message, str(e))
+
     def test_forbidden_title(self):
         e = exception.Forbidden()
         resp = wsgi.render_exception(e)
@@ -257,7 +257,7 @@ class V3TokenDataHelper(object):
         if project_id:
             roles = self.assignment_api.get_roles_for_user_and_project(
                 user_id, project_id)
-        return [self.role_api.get_role(role_id) for role_id in roles]
+        return self.role_api.get_roles(roles)
 
     def populate_roles_for_groups(self, token_data, group_ids,
                                   project_id=None, domain_id=None,